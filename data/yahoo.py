@@ -1,18 +1,26 @@
 import yfinance as yf
 import argparse
+import concurrent.futures
 from datetime import date, datetime
 from enum import IntEnum
 import os
 
-YYYY_MM_DD_FORMAT = '%Y-%m-%d'
-YYYYMMDD_FORMAT = '%Y%m%d'
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import requests
+
+# Yahoo serializes per-ticker fetches inside one yf.download call, so keep
+# each call small and run the calls concurrently instead
+DOWNLOAD_CHUNK_SIZE = 20
+MAX_DOWNLOAD_WORKERS = 8
+MAX_SAVE_WORKERS = 16
 
 
 SCRIPT_DESCRIPTION = '''
 Download Yahoo Finance historical data for Equity (common-stocks/ETFs)
 It supports running against multiple tickers for a given as-of date (run date)
-and stores each ticker in a <ticker>-<as-of-date>-<epoch-time>.csv format
-at a storage area.
+and stores each ticker in a <ticker>-<as-of-date>-<epoch-time>.<format> file
+(parquet by default, csv also supported) at a storage area.
 
 In general, ETF and common stock tickers can be stored at the same location. 
 If one ticker is generated multiple times on the same day, newer runs would 
@@ -31,37 +39,90 @@ class ReturnCode(IntEnum):
     FAILED_TO_FETCH_DATA_FROM_YAHOO = 6
 
 
+# date.fromisoformat/isoformat are straight C paths with no
+# format-string interpretation, unlike strptime/strftime
 def from_YYYY_MM_DD(ds: str) -> date:
     try:
-        return datetime.strptime(ds, YYYY_MM_DD_FORMAT).date()
-    except:
+        return date.fromisoformat(ds)
+    except ValueError:
         raise ValueError(f'cannot convert {ds} by yyyy-mm-dd format')
 
 
 def to_YYYY_MM_DD(dt: date) -> str:
-    return datetime.strftime(dt, YYYY_MM_DD_FORMAT)
+    return dt.isoformat()
 
 
 def to_YYYYMMDD(dt: date) -> str:
-    return datetime.strftime(dt, YYYYMMDD_FORMAT)
-
+    return f'{dt.year:04d}{dt.month:02d}{dt.day:02d}'
 
-def get_ticker_data(tickers: list[str], start_date: date, end_date: date):
-    if not tickers:
-        raise ValueError(f'{tickers} is not valid input for tickers')
 
-    df = yf.download(
-        tickers,
+def _download_chunk(chunk: list[str], start_date: date, end_date: date):
+    return yf.download(
+        chunk,
         start=to_YYYY_MM_DD(start_date),
         end=to_YYYY_MM_DD(end_date),
         auto_adjust=False, # keep Close and Adj. Close
-    )
-    return dict(
-        (ticker, df.xs(ticker, level='Ticker', axis=1)) 
-        for ticker in df.columns.levels[1]
+        threads=False, # concurrency is handled at the chunk level
+        progress=False,
     )
 
 
+def _split_by_ticker(df):
+    '''
+    Split a downloaded frame with (Price, Ticker) MultiIndex columns
+    into per-ticker frames. One pass over the columns to group their
+    positions, then one iloc take per ticker — instead of a per-ticker
+    .xs label scan, which is quadratic in the number of tickers
+    '''
+    positions = {}
+    for i, (_, ticker) in enumerate(df.columns):
+        positions.setdefault(ticker, []).append(i)
+    for ticker, columns in positions.items():
+        yield ticker, df.iloc[:, columns].droplevel('Ticker', axis=1)
+
+
+def iter_ticker_data(tickers: list[str], start_date: date, end_date: date):
+    '''
+    Yield (ticker, DataFrame) pairs as download chunks complete, split
+    into chunks of DOWNLOAD_CHUNK_SIZE and downloaded concurrently since
+    the workload is network-I/O bound. A chunk that fails is logged and
+    skipped rather than failing the whole batch. Streaming lets callers
+    start consuming frames before the whole universe has arrived.
+    '''
+    if not tickers:
+        raise ValueError(f'{tickers} is not valid input for tickers')
+
+    chunks = [
+        tickers[i:i + DOWNLOAD_CHUNK_SIZE]
+        for i in range(0, len(tickers), DOWNLOAD_CHUNK_SIZE)
+    ]
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(MAX_DOWNLOAD_WORKERS, len(chunks))
+    ) as executor:
+        future_to_chunk = {
+            executor.submit(_download_chunk, chunk, start_date, end_date): chunk
+            for chunk in chunks
+        }
+        for future in concurrent.futures.as_completed(future_to_chunk):
+            chunk = future_to_chunk[future]
+            try:
+                df = future.result()
+                yield from _split_by_ticker(df)
+            except requests.HTTPError as e:
+                print(f'failed to fetch chunk {chunk} from yahoo: {e}')
+            except KeyError as e:
+                print(f'unexpected column layout for chunk {chunk}: {e}')
+
+
+def get_ticker_data(tickers: list[str], start_date: date, end_date: date):
+    '''
+    Eager variant of iter_ticker_data: fetch everything and return the
+    ticker to DataFrame dict
+    '''
+    return dict(iter_ticker_data(tickers, start_date, end_date))
+
+
 def read_tickers_from_file(ticker_file_path: str) -> list[str]:
     '''
     For example, the following content would yield SPY/VOO/GLD in the list 
@@ -79,18 +140,54 @@ def read_tickers_from_file(ticker_file_path: str) -> list[str]:
     :rtype: list[str]
     '''
     with open(ticker_file_path, 'r') as f:
-        valid_list = []
-        for line in f: 
-            token = line.split('#')[0].strip()
-            if token:
-                valid_list.append(token)
-    return valid_list
-
-
-def save_to_csv_files(output_path: str, as_of_date: str, ticker: str, df, timestamp: int):
+        text = f.read()
+    # single comprehension keeps the hot loop in C for large universes
+    return [
+        token
+        for token in (line.partition('#')[0].strip() for line in text.splitlines())
+        if token
+    ]
+
+
+def save_to_csv_files(
+        output_path: str, as_of_date: str, ticker: str, df, timestamp: int,
+        use_arrow_csv: bool = True,
+):
     file_path = os.path.join(output_path, f'{ticker}.csv')
     print(f'writing data for {ticker} to {file_path}')
-    df.to_csv(file_path)
+    # writing the DatetimeIndex as a regular column avoids pandas'
+    # per-row index-formatting slow path in to_csv
+    out = df.reset_index(names='Date')
+    if use_arrow_csv:
+        # Arrow's C++ csv writer has no per-row Python formatting at all;
+        # cast the timestamp column down to date so it renders yyyy-mm-dd
+        # like pandas does
+        table = pa.Table.from_pandas(out, preserve_index=False)
+        date_index = table.column_names.index('Date')
+        table = table.set_column(
+            date_index, 'Date', table['Date'].cast(pa.date32())
+        )
+        pa_csv.write_csv(
+            table, file_path,
+            write_options=pa_csv.WriteOptions(batch_size=65536),
+        )
+    else:
+        out.to_csv(file_path, index=False)
+
+
+def save_to_parquet_files(output_path: str, as_of_date: str, ticker: str, df, timestamp: int):
+    # parquet is columnar: much smaller files and far faster writes/reads
+    # than pandas' row-by-row csv formatting
+    file_path = os.path.join(output_path, f'{ticker}.parquet')
+    print(f'writing data for {ticker} to {file_path}')
+    df.to_parquet(file_path, engine='pyarrow', compression='snappy')
+
+
+# maps each --format choice to its per-ticker writer
+FORMAT_SAVERS = {
+    'csv': save_to_csv_files,
+    'parquet': save_to_parquet_files,
+}
 
 
 def get_cli_parser():
@@ -118,6 +215,12 @@ def get_cli_parser():
         required=True,
         help='as-of-date of the script running date (i.e. date of today)',
     )
+    parser.add_argument(
+        '--format',
+        choices=sorted(FORMAT_SAVERS),
+        default='parquet',
+        help='output file format (default: parquet)',
+    )
 
     ticker_group = parser.add_mutually_exclusive_group(required=True)
     ticker_group.add_argument(
@@ -138,41 +241,76 @@ def run() -> ReturnCode:
     
     print(args)
 
-    if not os.path.exists(args.output_path):
-        return ReturnCode.NON_EXISTING_OUTPUT_PATH
-
+    # EAFP: let open/makedirs report problems instead of paying an
+    # extra stat syscall per path up front
     if args.ticker:
         tickers_to_fetch = list(args.ticker)
     elif args.ticker_file_path:
-        if not os.path.exists(args.ticker_file_path):
-            return ReturnCode.NON_EXISTING_TICKER_FILE
         try:
             tickers_to_fetch = read_tickers_from_file(args.ticker_file_path)
-        except:
+        except FileNotFoundError:
+            return ReturnCode.NON_EXISTING_TICKER_FILE
+        except Exception:
             return ReturnCode.FAILED_TO_READ_FROM_TICKER_FILE
 
+    # normalize case (Yahoo is case-insensitive, file naming is not) and
+    # drop duplicates while preserving order, so spy/SPY costs one
+    # download and one file
+    tickers_to_fetch = list(dict.fromkeys(t.upper() for t in tickers_to_fetch))
+
     if not tickers_to_fetch:
         return ReturnCode.NO_TICKER_TO_PROCESS
 
-    try:
-        ret = get_ticker_data(tickers_to_fetch, args.start_date, args.end_date)
-    except Exception as e:
-        return ReturnCode.FAILED_TO_FETCH_DATA_FROM_YAHOO
-    
-    if not ret:
-        return ReturnCode.FAILED_TO_FETCH_DATA_FROM_YAHOO
-     
     as_of_date = to_YYYYMMDD(args.as_of_date)
     print(f'as-of-date is {as_of_date}')
-    
+
     as_of_date_output_path = os.path.join(args.output_path, as_of_date)
-    # make sure the ticker subdirectory exists
-    os.makedirs(as_of_date_output_path, exist_ok=True)
+    try:
+        # idempotent and also creates the output root, so no separate
+        # exists check is needed
+        os.makedirs(as_of_date_output_path, exist_ok=True)
+    except OSError as e:
+        print(f'cannot create output path {as_of_date_output_path}: {e}')
+        return ReturnCode.NON_EXISTING_OUTPUT_PATH
 
     timestamp = int(datetime.now().timestamp())
-    for ticker, df in ret.items():
-        # output_path is already validated
-        save_to_csv_files(as_of_date_output_path, as_of_date, ticker, df, timestamp)
+    save_files = FORMAT_SAVERS[args.format]
+
+    # pipeline fetch and write: each frame is submitted for writing as
+    # soon as its chunk arrives, so peak memory is bounded by in-flight
+    # frames instead of the whole universe. Writes are independent and
+    # I/O bound; one bad ticker should not fail the whole batch
+    failed_tickers = []
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=MAX_SAVE_WORKERS
+    ) as executor:
+        future_to_ticker = {}
+        try:
+            for ticker, df in iter_ticker_data(
+                tickers_to_fetch, args.start_date, args.end_date
+            ):
+                # output_path is already validated
+                future = executor.submit(
+                    save_files, as_of_date_output_path, as_of_date, ticker, df, timestamp
+                )
+                future_to_ticker[future] = ticker
+        except Exception as e:
+            print(f'failed to fetch data from yahoo: {e}')
+            return ReturnCode.FAILED_TO_FETCH_DATA_FROM_YAHOO
+        for future in concurrent.futures.as_completed(future_to_ticker):
+            ticker = future_to_ticker[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f'failed to save data for {ticker}: {e}')
+                failed_tickers.append(ticker)
+
+    if not future_to_ticker:
+        return ReturnCode.FAILED_TO_FETCH_DATA_FROM_YAHOO
+
+    if failed_tickers:
+        print(f'failed to save {len(failed_tickers)} tickers: {failed_tickers}')
+        return ReturnCode.FAILED_TO_SAVE_TO_OUTPUT_PATH
 
     return ReturnCode.SUCCESS
 
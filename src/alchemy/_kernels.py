@@ -0,0 +1,67 @@
+'''
+JIT-compiled numeric kernels for portfolio analytics.
+
+numba is treated as optional: when it is importable the kernels are
+compiled with parallel loops, otherwise the same computation runs as
+plain vectorized numpy so callers never have to care which path they
+got.
+'''
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+def _risk_kernel_numpy(P: np.ndarray):
+    lr = np.diff(np.log(P), axis=0)
+    # nan-aware like the pandas reductions (skipna=True), so assets with
+    # missing prices still get finite metrics
+    return lr, np.nanmean(lr, axis=0), np.nanstd(lr, axis=0, ddof=1)
+
+
+if HAVE_NUMBA:
+    # fastmath is restricted to flags that keep NaN semantics intact;
+    # 'nnan'/'ninf' would let LLVM fold the isfinite checks away
+    @njit(parallel=True, fastmath={'contract', 'reassoc', 'arcp'}, cache=True)
+    def risk_kernel(P):
+        '''
+        One fused pass over a T x N price matrix: per-asset log returns,
+        their mean and their sample std (ddof=1), with no intermediate
+        full-size temporaries beyond the returns themselves. Non-finite
+        returns (missing prices) are skipped in the reductions, matching
+        pandas' skipna behavior
+        '''
+        T, N = P.shape
+        lr = np.empty((T - 1, N), dtype=P.dtype)
+        mean = np.empty(N, dtype=P.dtype)
+        std = np.empty(N, dtype=P.dtype)
+        for j in prange(N):
+            prev = np.log(P[0, j])
+            for i in range(1, T):
+                cur = np.log(P[i, j])
+                lr[i - 1, j] = cur - prev
+                prev = cur
+            acc = 0.0
+            count = 0
+            for i in range(T - 1):
+                value = lr[i, j]
+                if np.isfinite(value):
+                    acc += value
+                    count += 1
+            mu = acc / count if count > 0 else np.nan
+            mean[j] = mu
+            sq_acc = 0.0
+            for i in range(T - 1):
+                value = lr[i, j]
+                if np.isfinite(value):
+                    diff = value - mu
+                    sq_acc += diff * diff
+            std[j] = math.sqrt(sq_acc / (count - 1)) if count > 1 else np.nan
+        return lr, mean, std
+else:
+    risk_kernel = _risk_kernel_numpy
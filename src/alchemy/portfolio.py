@@ -1,7 +1,18 @@
+import math
+
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from functools import cached_property
 from typing import NamedTuple
 
+from alchemy._kernels import risk_kernel
+
+
+BDAYS_PER_YEAR = 252
+SQRT_BDAYS_PER_YEAR = math.sqrt(BDAYS_PER_YEAR)
+
 
 # Note that all the following 3 data types are equally applicable to portfolio
 # level analytics, with just 1-column. This trades purity for uniformity in 
@@ -24,37 +35,91 @@ class AssetRiskProfile(NamedTuple):
     metrics: AssetMetrics
 
 
+class AssetRiskAnalyzer:
+    '''
+    Wraps an AssetRiskProfile for repeated portfolio evaluations, e.g.
+    trying many weight vectors in an optimization loop. The contiguous
+    log-return matrix and the covariance matrix are each computed once
+    and cached; per-weight variance is a streaming R @ w followed by a
+    scalar var, so no N x N scratch is allocated per evaluation
+    '''
+
+    def __init__(self, asset_risk_profile: AssetRiskProfile):
+        self.asset_risk_profile = asset_risk_profile
+
+    @cached_property
+    def log_return_matrix(self) -> np.ndarray:
+        return np.ascontiguousarray(
+            self.asset_risk_profile.time_series.log_returns.to_numpy()
+        )
+
+    @cached_property
+    def covariance(self) -> pd.DataFrame:
+        # only for callers that need the full matrix; portfolio variance
+        # itself never materializes it
+        return self.asset_risk_profile.time_series.log_returns.cov()
+
+    def portfolio_daily_variance(self, weights: np.ndarray) -> float:
+        R = self.log_return_matrix
+        Rw = R @ np.ascontiguousarray(weights, dtype=R.dtype)
+        return Rw.var(ddof=1)
+
+
 def get_asset_risk_profile(
-        dfs: list[pd.DataFrame], 
-        asset_names: list[str], 
-        price_field_name: str
+        dfs: list[pd.DataFrame],
+        asset_names: list[str],
+        price_field_name: str,
+        dtype: np.dtype = np.float32,
 ) -> AssetRiskProfile:
     '''
     given a dictionary of asset name to its DataFrame, extract specified
-    price field name from each DataFrame and construct a new one, with 
-    asset name as the price colume name. 
+    price field name from each DataFrame and construct a new one, with
+    asset name as the price colume name.
 
     The caller is responsible for aligning data with asset names
 
+    float32 is the default dtype: the reductions and matmuls downstream
+    are memory-bandwidth bound, so halving the element size roughly
+    doubles throughput, and single precision is plenty for daily close
+    levels. Pass np.float64 where precision matters more (e.g.
+    tick-level intraday data)
+
     :param df_map: Description
     :type df_map: dict[str, pd.DataFrame]
     :param price_field_name: Description
     :type price_field_name: str
+    :param dtype: dtype for the price/return matrices
+    :type dtype: np.dtype
     '''
 
     if len(dfs) != len(asset_names):
         raise ValueError(f'{len(dfs)} DataFrames vs {len(asset_names)} names')
-    
-    prices = pd.concat([df[price_field_name] for df in dfs], axis=1)
-    prices.columns = asset_names
-    
-    log_returns = np.log(prices / prices.shift(1)).iloc[1:]
 
-    daily_return = log_returns.mean()
-    daily_vol = log_returns.std()
+    index = dfs[0].index
+    if all(df.index.equals(index) for df in dfs[1:]):
+        # identically indexed: stack the raw arrays and wrap once, which
+        # skips pd.concat's per-block bookkeeping
+        arr = np.column_stack(
+            [df[price_field_name].to_numpy(dtype=dtype) for df in dfs]
+        )
+        prices = pd.DataFrame(arr, index=index, columns=asset_names, copy=False)
+    else:
+        prices = pd.concat([df[price_field_name] for df in dfs], axis=1)
+        prices.columns = asset_names
+        prices = prices.astype(dtype, copy=False)
+
+    # log returns plus their mean/std in one fused kernel pass
+    # (numba-compiled when available, numpy otherwise)
+    lr, mu, sigma = risk_kernel(np.ascontiguousarray(prices.to_numpy()))
+    log_returns = pd.DataFrame(
+        lr, index=prices.index[1:], columns=prices.columns, copy=False
+    )
+
+    daily_return = pd.Series(mu, index=prices.columns)
+    daily_vol = pd.Series(sigma, index=prices.columns)
 
-    annual_return = daily_return * 252 # business day count in a year
-    annual_vol = daily_vol * np.sqrt(252)
+    annual_return = daily_return * BDAYS_PER_YEAR
+    annual_vol = daily_vol * SQRT_BDAYS_PER_YEAR
     
     return AssetRiskProfile(
         time_series=AssetTimeSeries(
@@ -70,7 +135,136 @@ def get_asset_risk_profile(
     )
 
 
-def get_portfolio_risk_profile(
+def get_asset_risk_profile_polars(
+        dfs: list[pd.DataFrame],
+        asset_names: list[str],
+        price_field_name: str,
+) -> AssetRiskProfile:
+    '''
+    Polars-backed variant of get_asset_risk_profile. The lazy engine
+    fuses the per-asset log-return expressions into one plan and runs
+    the columns in parallel, which pays off for wide universes; pandas
+    stays at the API boundary so the returned profile is
+    interchangeable with the other constructors. Requires polars, hence
+    the local import
+
+    :param dfs: Description
+    :type dfs: list[pd.DataFrame]
+    :param asset_names: Description
+    :type asset_names: list[str]
+    :param price_field_name: Description
+    :type price_field_name: str
+    '''
+    import polars as pl
+
+    if len(dfs) != len(asset_names):
+        raise ValueError(f'{len(dfs)} DataFrames vs {len(asset_names)} names')
+
+    index = dfs[0].index
+    frame = pl.DataFrame({
+        name: pl.Series(name, df[price_field_name].to_numpy())
+        for name, df in zip(asset_names, dfs)
+    })
+    log_return_frame = (
+        frame.lazy()
+        .select([
+            (pl.col(name) / pl.col(name).shift(1)).log().alias(name)
+            for name in asset_names
+        ])
+        .slice(1)
+        .collect()
+    )
+
+    # polars std defaults to ddof=1, matching the pandas path
+    daily_return = pd.Series(log_return_frame.mean().row(0), index=asset_names)
+    daily_vol = pd.Series(log_return_frame.std().row(0), index=asset_names)
+
+    prices = pd.DataFrame(
+        frame.to_numpy(), index=index, columns=asset_names, copy=False
+    )
+    log_returns = pd.DataFrame(
+        log_return_frame.to_numpy(), index=index[1:], columns=asset_names,
+        copy=False,
+    )
+
+    return AssetRiskProfile(
+        time_series=AssetTimeSeries(
+            prices=prices,
+            log_returns=log_returns,
+        ),
+        metrics=AssetMetrics(
+            daily_return=daily_return,
+            daily_vol=daily_vol,
+            annual_return=daily_return * BDAYS_PER_YEAR,
+            annual_vol=daily_vol * SQRT_BDAYS_PER_YEAR,
+        ),
+    )
+
+
+def get_asset_risk_profile_from_arrow(
+        table: pa.Table,
+        asset_names: list[str] | None = None,
+        date_field_name: str = 'Date',
+) -> AssetRiskProfile:
+    '''
+    Arrow-native variant of get_asset_risk_profile for data that is
+    already a pyarrow.Table (e.g. straight out of parquet). Log returns
+    and the mean/std reductions run on the Arrow columns via
+    pyarrow.compute, all native code; pandas frames are only built at
+    the boundary to populate the NamedTuple fields
+
+    :param table: one numeric column per asset, plus an optional date
+        column used as the time index
+    :type table: pa.Table
+    :param asset_names: columns to treat as assets; defaults to every
+        column except date_field_name
+    :type asset_names: list[str] | None
+    :param date_field_name: Description
+    :type date_field_name: str
+    '''
+    if date_field_name in table.column_names:
+        index = pd.Index(table[date_field_name].to_pandas(), name=date_field_name)
+        table = table.drop_columns([date_field_name])
+    else:
+        index = pd.RangeIndex(table.num_rows)
+
+    if asset_names is None:
+        asset_names = table.column_names
+
+    log_return_columns = {}
+    daily_return = {}
+    daily_vol = {}
+    for name in asset_names:
+        # log(p_t / p_{t-1}) as pairwise diff of log prices; drop the
+        # leading null from the diff
+        lr = pc.pairwise_diff(pc.ln(table[name].combine_chunks())).slice(1)
+        log_return_columns[name] = lr
+        daily_return[name] = pc.mean(lr).as_py()
+        daily_vol[name] = pc.stddev(lr, ddof=1).as_py()
+
+    prices = table.select(asset_names).to_pandas()
+    prices.index = index
+    log_returns = pa.table(log_return_columns).to_pandas()
+    log_returns.index = index[1:]
+
+    daily_return = pd.Series(daily_return)
+    daily_vol = pd.Series(daily_vol)
+
+    return AssetRiskProfile(
+        time_series=AssetTimeSeries(
+            prices=prices,
+            log_returns=log_returns,
+        ),
+        metrics=AssetMetrics(
+            daily_return=daily_return,
+            daily_vol=daily_vol,
+            annual_return=daily_return * BDAYS_PER_YEAR,
+            annual_vol=daily_vol * SQRT_BDAYS_PER_YEAR,
+        ),
+    )
+
+
+def get_portfolio_risk_profile_from_shares(
         prices: pd.DataFrame,
         asset_shares: np.ndarray,
 ) -> AssetRiskProfile:
@@ -84,21 +278,29 @@ def get_portfolio_risk_profile(
     :type asset_shares: np.ndarray
     :return: Description
     :rtype: AssetRiskProfile
-    
+
     '''
-    
+
     if len(prices.columns) != len(asset_shares):
         raise ValueError(
             f'{len(prices.columns)} assets vs {len(asset_shares)} asset shares'
         )
     portfolio_prices = (prices @ asset_shares).to_frame('portfolio')
-    portfolio_log_returns = (portfolio_prices / portfolio_prices.shift(1)).dropna()
+    # two zero-copy views into the price array instead of a NaN-padded
+    # shift copy that dropna would discard anyway
+    pp = portfolio_prices.to_numpy()
+    portfolio_log_returns = pd.DataFrame(
+        np.log(pp[1:] / pp[:-1]),
+        index=portfolio_prices.index[1:],
+        columns=portfolio_prices.columns,
+        copy=False,
+    )
 
     daily_return = portfolio_log_returns.mean()
     daily_vol = portfolio_log_returns.std()
 
-    annual_return = daily_return * 252
-    annual_vol = daily_vol * np.sqrt(252)
+    annual_return = daily_return * BDAYS_PER_YEAR
+    annual_vol = daily_vol * SQRT_BDAYS_PER_YEAR
 
     return AssetRiskProfile(
         time_series=AssetTimeSeries(
@@ -119,50 +321,82 @@ def get_portfolio_metrics(
         weights: np.ndarray,
 ) -> AssetMetrics:
     '''
-    
-    
-    :param log_returns: Description
+    Compute observed portfolio metrics from asset level log returns and
+    normalized weights, without materializing the full covariance matrix:
+    the portfolio return series R @ w is a single BLAS gemv, and its
+    sample std equals sqrt(w' * cov * w)
+
+    :param log_returns: asset level daily log returns, one column per asset
     :type log_returns: pd.DataFrame
-    :param weights: Description
+    :param weights: normalized weights for each asset
     :type weights: np.ndarray
     :return: Description
     :rtype: AssetMetrics
     '''
-    pass
+    R = np.ascontiguousarray(log_returns.to_numpy())
+    w = np.ascontiguousarray(weights, dtype=R.dtype)
+    Rw = R @ w # gemv
+
+    daily_return = pd.Series([Rw.mean()], index=['portfolio'])
+    daily_vol = pd.Series([Rw.std(ddof=1)], index=['portfolio'])
+
+    return AssetMetrics(
+        daily_return=daily_return,
+        daily_vol=daily_vol,
+        annual_return=daily_return * BDAYS_PER_YEAR,
+        annual_vol=daily_vol * SQRT_BDAYS_PER_YEAR,
+    )
 
 
 def get_portfolio_risk_profile(
-        asset_risk_profile: AssetRiskProfile, 
+        asset_risk_profile: AssetRiskProfile,
         weights: np.ndarray,
-     
 ) -> AssetRiskProfile:
     '''
     Given individual asset risk/return profile, and weights for each asset,
     this function computes the portfolio level risk/return profile
-    
+
     The portfolio characteristics are described in a MATLAB style language:
     Let normalized weights be a column vector w (expected input)
     Let covariance matrix of the lognormally (in theory) distributted ∑
-    
+
     If daily return across different assets are r as a column vector,
     then the daily return of the portfolio is r_p = w * r (linear combination)
 
-    Then the variance is Var(r_p) = Var(w * r) = w' * ∑ * w 
+    Then the variance is Var(r_p) = Var(w * r) = w' * ∑ * w
     by variance of a linear combination
 
-    :param asset_risk_return: Description
-    :type asset_risk_return: AssetRiskReturn
+    :param asset_risk_profile: Description
+    :type asset_risk_profile: AssetRiskProfile
     :param weights: Description
     :type weights: np.ndarray
     :return: Description
-    :rtype: AssetRiskReturn
+    :rtype: AssetRiskProfile
     '''
-    (asset_prices, asset_log_returns), asset_metrics = asset_risk_profile
-    
+    time_series = asset_risk_profile.time_series
+
+    if len(time_series.prices.columns) != len(weights):
+        raise ValueError(
+            f'{len(time_series.prices.columns)} assets vs {len(weights)} weights'
+        )
+
+    # contiguous arrays so the matrix-vector products hit BLAS gemv
+    P = np.ascontiguousarray(time_series.prices.to_numpy())
+    R = np.ascontiguousarray(time_series.log_returns.to_numpy())
+    w = np.ascontiguousarray(weights, dtype=P.dtype)
+
     # input weights are expected to be normalized
-    portfolio_prices = weights @ asset_prices
-    portfolio_log_returns = weights @ asset_log_returns
+    portfolio_prices = pd.DataFrame(
+        P @ w, index=time_series.prices.index, columns=['portfolio'], copy=False
+    )
+    portfolio_log_returns = pd.DataFrame(
+        R @ w, index=time_series.log_returns.index, columns=['portfolio'], copy=False
+    )
 
-    # 
-    portfolio_daily_returns = weights @ asset_metrics.daily_return
-    portfolio_daily_variance = weights @ asset_time_series.log_returns.cov() @ weights
+    return AssetRiskProfile(
+        time_series=AssetTimeSeries(
+            prices=portfolio_prices,
+            log_returns=portfolio_log_returns,
+        ),
+        metrics=get_portfolio_metrics(time_series.log_returns, w),
+    )